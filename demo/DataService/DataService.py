@@ -1,5 +1,6 @@
 from pathlib import Path
 import sqlite3
+import threading
 
 # 获取全局logger实例，只能在简单服务中使用
 logger = globals().get('logger')
@@ -10,6 +11,24 @@ if logger is None:
     logger = logging.getLogger(__name__)
 
 
+_SQL_LOAD = 'SELECT key, value FROM robot_config'
+_SQL_SET = 'INSERT OR REPLACE INTO robot_config (key, value) VALUES (?, ?)'
+_SQL_DEL = 'DELETE FROM robot_config WHERE key = ?'
+"""
+常用语句固定为模块常量，SQL 文本不变，sqlite3 内部的语句缓存即可命中，省去重复解析
+"""
+
+_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-20000',
+)
+"""
+连接级优化：WAL 模式下读写互不阻塞，synchronous=NORMAL 大幅减少提交时的 fsync
+"""
+
+
 def __init_db():
     """
     初始化数据库
@@ -24,7 +43,11 @@ def __init_db():
         db_path = data_dir / 'data.db'
 
         # 连接到数据库
-        conn = sqlite3.connect(db_path)
+        # isolation_level=None 关闭隐式事务，只在写入时显式 BEGIN/COMMIT，读操作不会占用写锁
+        conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        conn.set_trace_callback(None)
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
         cursor = conn.cursor()
         logger.info("数据库打开成功")
 
@@ -37,7 +60,6 @@ def __init_db():
             );
         ''')
         logger.info("表创建成功")
-        conn.commit()
 
         return conn
     except Exception as e:
@@ -47,28 +69,77 @@ def __init_db():
 
 conn = __init_db()
 """
-全局变量，用于持有唯一的数据库连接实例
+全局变量，用于持有唯一的读写连接实例
 """
 
+_write_lock = threading.Lock()
+"""
+写锁，所有写操作在读写连接上串行执行
+"""
 
-def get_robot_config(key: str):
-    """根据 key 获取配置值。"""
+_rw_cursor = conn.cursor() if conn else None
+"""
+读写连接上复用的游标，受写锁保护
+"""
+
+
+def _exec(sql: str, params: tuple):
+    """
+    在读写连接上以显式事务执行一条写语句。
+
+    出错时回滚并继续抛出 sqlite3.Error。
+    """
+    with _write_lock:
+        _rw_cursor.execute('BEGIN')
+        try:
+            _rw_cursor.execute(sql, params)
+            _rw_cursor.execute('COMMIT')
+        except sqlite3.Error:
+            _rw_cursor.execute('ROLLBACK')
+            raise
+
+
+_cache: dict[str, str] = {}
+"""
+全部配置项的内存缓存，读操作直接命中，写操作同步更新（write-through）
+"""
+
+_cache_lock = threading.RLock()
+"""
+保护内存缓存，保证缓存与数据库的更新顺序一致
+"""
+
+
+def __load_cache():
+    """
+    启动时把整张配置表读入内存缓存
+    """
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT value FROM robot_config WHERE key = ?', (key,))
-        result = cursor.fetchone()
-        return result[0] if result else None
+        with _write_lock:
+            rows = _rw_cursor.execute(_SQL_LOAD).fetchall()
+        with _cache_lock:
+            _cache.update(rows)
+        logger.info(f"配置缓存加载成功，共 {len(rows)} 项")
     except sqlite3.Error as e:
-        logger.error(f"获取配置 '{key}' 失败: {e}")
-        return None
+        logger.error(f"加载配置缓存失败: {e}")
+
+
+if conn:
+    __load_cache()
+
+
+def get_robot_config(key: str):
+    """根据 key 获取配置值。"""
+    with _cache_lock:
+        return _cache.get(key)
 
 
 def set_robot_config(key: str, value: str):
     """设置或更新一个配置项。"""
     try:
-        cursor = conn.cursor()
-        cursor.execute('INSERT OR REPLACE INTO robot_config (key, value) VALUES (?, ?)', (key, str(value)))
-        conn.commit()
+        with _cache_lock:
+            _exec(_SQL_SET, (key, str(value)))
+            _cache[key] = str(value)
         logger.info(f"配置 '{key}' 已设置为 '{value}'。")
         return True
     except sqlite3.Error as e:
@@ -78,9 +149,9 @@ def set_robot_config(key: str, value: str):
 def delete_robot_config(key: str):
     """根据 key 删除一个配置项。"""
     try:
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM robot_config WHERE key = ?', (key,))
-        conn.commit()
+        with _cache_lock:
+            _exec(_SQL_DEL, (key,))
+            _cache.pop(key, None)
         logger.info(f"配置 '{key}' 已删除。")
         return True
     except sqlite3.Error as e:
@@ -1,4 +1,5 @@
 import requests
+from requests.adapters import HTTPAdapter
 
 from Agilebot import Extension, StatusCodeEnum
 
@@ -15,6 +16,13 @@ if logger is None:
 ROBOT_IP = "10.27.1.254"
 """机器人IP"""
 
+_extension = Extension(ROBOT_IP)
+"""插件管理实例，多次调用之间复用"""
+
+_session = requests.Session()
+"""HTTP 会话，复用 TCP 连接，避免每次调用都重新建立连接"""
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 
 def tcp_velocity(r_index: int):
     """
@@ -33,15 +41,13 @@ def tcp_velocity(r_index: int):
 
     :param r_index: 需要写入的 R 寄存器索引
     """
-    extension = Extension(ROBOT_IP)
-
-    res, ret = extension.get("TcpVelocity")
+    res, ret = _extension.get("TcpVelocity")
     if ret != StatusCodeEnum.OK:
         raise Exception("获取TcpVelocity插件失败")
     if not res.state.isRunning:
         raise Exception("TcpVelocity插件未运行")
     api_url = f"http://{ROBOT_IP}:{res.state.port}/api/set_tcp_velocity_r_index"
-    requests.post(api_url, json={"index": r_index}).json()
+    _session.post(api_url, json={"index": r_index}, timeout=2).raise_for_status()
 
 
 if __name__ == "__main__":
@@ -30,7 +30,7 @@ from server.ipc_utils import IPCManager
 from server.config import ASSETS_DIR, ROOT_DIR, ROBOT_IP, PORT, HOST
 from server.logger import logger
 from server.state import SharedState
-from server.models import MessageType, SetTcpVelocityIndexRequest
+from server.models import SetTcpVelocityIndexRequest
 
 
 @asynccontextmanager
@@ -42,21 +42,15 @@ async def lifespan(app: FastAPI):
     """
 
     async def _ipc_handle(item):
-        """队列消息处理：广播到 WebSocket，并维护 TCP 速度缓存。"""
+        """IPC 消息处理：广播到 WebSocket。"""
         try:
+            # 子进程已序列化好的 JSON 字节串会被直接广播，不再重复编码
             await ws_server.broadcast(item)
         except Exception:
             logger.exception("广播消息失败")
-        if isinstance(item, dict) and item.get("type") == MessageType.TCP_VELOCITY:
-            try:
-                SharedState.set("last_tcp_velocity", float(item.get("velocity") or 0.0))
-            except Exception:
-                pass
-
-    spawn = lambda q: start_robot_process(ROBOT_IP, q)
-    ipc = IPCManager(
-        spawn_proc=spawn, handler=_ipc_handle, log=logger, watch_interval=2.0
-    )
+
+    spawn = lambda conn: start_robot_process(ROBOT_IP, conn)
+    ipc = IPCManager(spawn_proc=spawn, handler=_ipc_handle, log=logger)
     await ipc.start()
     logger.info("机器人服务已启动")
 
@@ -1,6 +1,7 @@
-import json
 import asyncio
 import logging
+
+import orjson
 from fastapi import WebSocket
 from pydantic import BaseModel
 
@@ -16,47 +17,90 @@ class BaseWebSocketServer:
 
     能力：
     - register/unregister：与 websocket_endpoint 配合维护连接集合；
-    - broadcast：接受 dict 或 Pydantic 模型并序列化为 JSON 文本广播；
-    - 自动断连处理：发送失败时清理失效连接，保持集合健康。
+    - broadcast：接受 dict、Pydantic 模型或已序列化的 JSON 字节串并广播；
+    - broadcast_json：直接广播已序列化的 JSON 字节串，跳过编码；
+    - 并发发送：各客户端并行发送并设置超时，慢客户端不会拖慢其他客户端；
+    - 自动断连处理：发送失败或超时时剔除并关闭失效连接，保持集合健康。
     """
 
-    def __init__(self):
+    def __init__(self, send_timeout: float = 2.0, max_concurrency: int = 100):
+        """
+        Args:
+            send_timeout: 单个客户端发送超时时间，单位秒，超时视为失效连接。
+            max_concurrency: 同时进行的发送数量上限。
+        """
         self._clients: set[WebSocket] = set()
         self._clients_lock = asyncio.Lock()
+        self._send_timeout = send_timeout
+        self._send_semaphore = asyncio.Semaphore(max_concurrency)
 
-    async def broadcast(self, body: dict | BaseModel):
+    async def broadcast(self, body: dict | BaseModel | bytes):
         """
         把消息广播给所有客户端。
 
         Args:
-            body: 可以是 dict 或 Pydantic 模型；会被统一序列化为 JSON 文本。
+            body: 可以是 dict 或 Pydantic 模型，会被统一序列化为 JSON 文本；
+                也可以是已序列化的 JSON 字节串，此时不再重复编码。
         """
+        if isinstance(body, (bytes, bytearray)):
+            await self.broadcast_json(body)
+            return
+
         # Pydantic v2 模型可直接 model_dump，普通 dict 则原样转换
-        message = (
-            json.dumps(body.model_dump(exclude_none=True), ensure_ascii=False)
-            if isinstance(body, BaseModel)
-            else json.dumps(body, ensure_ascii=False)
+        await self.broadcast_json(
+            orjson.dumps(
+                body.model_dump(exclude_none=True)
+                if isinstance(body, BaseModel)
+                else body
+            )
         )
 
+    async def broadcast_json(self, payload: bytes):
+        """
+        把已经序列化好的 JSON 字节串广播给所有客户端，不再重复编码。
+
+        机器人子进程会提前序列化消息，主进程收到后直接广播；需要反复发送同一条
+        消息的调用方也可以缓存其字节串，每次直接调用本方法。
+
+        Args:
+            payload: UTF-8 编码的 JSON 字节串。
+        """
+        # 只解码一次，前端仍按文本帧 JSON.parse
+        message = payload.decode()
+
         async with self._clients_lock:
             clients = list(self._clients)
         if not clients:
             return
 
-        # 收集发送失败的客户端，批量剔除，避免在锁内做大量 IO
-        to_remove = []
-        for ws in clients:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                to_remove.append(ws)
+        async def _safe_send(ws: WebSocket) -> WebSocket | None:
+            """发送给单个客户端；失败或超时时返回该连接以便剔除。"""
+            async with self._send_semaphore:
+                try:
+                    await asyncio.wait_for(ws.send_text(message), self._send_timeout)
+                    return None
+                except Exception:
+                    return ws
+
+        # 并发发送，收集发送失败的客户端，批量剔除，避免在锁内做大量 IO
+        results = await asyncio.gather(*(_safe_send(ws) for ws in clients))
+        to_remove = [ws for ws in results if ws is not None]
 
         if to_remove:
             async with self._clients_lock:
                 for ws in to_remove:
                     self._clients.discard(ws)
+            # 超时的连接可能仍然存活，主动关闭，让 websocket_endpoint 退出、前端重连
+            await asyncio.gather(*(self._safe_close(ws) for ws in to_remove))
             logger.warning(f"已自动清理 {len(to_remove)} 个失效的 WebSocket 连接")
 
+    async def _safe_close(self, ws: WebSocket):
+        """关闭失效的客户端连接，忽略关闭过程中的异常。"""
+        try:
+            await asyncio.wait_for(ws.close(), self._send_timeout)
+        except Exception:
+            pass
+
     async def register_client(self, websocket: WebSocket):
         """新客户端接入时调用，加入集合以便后续广播。"""
         async with self._clients_lock:
@@ -3,13 +3,13 @@
 IPC 工具方法。
 
 TcpVelocity 采用“双进程”架构：FastAPI 主进程负责 HTTP/WebSocket 服务，
-机器人子进程负责直连机器人并把状态写入 multiprocessing.Queue。
+机器人子进程负责直连机器人，并把序列化好的 JSON 字节串写入单向 multiprocessing.Pipe。
 本模块提供若干基础设施，使主进程可以：
 
 1. 以 spawn 方式启动机器人子进程（确保与 FastAPI 事件循环隔离）；
-2. 将 Pydantic 模型或 dict 安全地放入/取出队列；
-3. 启动消费者协程把队列数据交给 WebSocket 广播器；
-4. 监视子进程存活状态并在异常退出后自动拉起。
+2. 将 Pydantic 模型或 dict 转换为可序列化数据；
+3. 把管道读端注册到事件循环，数据到达时读入，再经消费者协程交给 WebSocket 广播器；
+4. 把子进程 sentinel 注册到事件循环，子进程退出时立即收到通知并自动拉起。
 """
 
 from __future__ import annotations
@@ -17,9 +17,11 @@ from __future__ import annotations
 import asyncio
 import multiprocessing as mp
 import logging
-from queue import Empty
+from multiprocessing.connection import Connection
 from typing import Any, Awaitable, Callable
 
+from pydantic import BaseModel
+
 
 def start_process(
     target: Callable[..., Any], args: tuple = (), daemon: bool = True
@@ -38,48 +40,29 @@ def start_process(
     return p
 
 
-async def async_queue_put(q: mp.Queue, item: Any) -> None:
-    """
-    在协程环境中向 multiprocessing.Queue 放入数据。
-
-    Queue.put 是阻塞的，为避免卡住 FastAPI 事件循环，这里借助线程池执行。
-    """
-    loop = asyncio.get_running_loop()
-    await loop.run_in_executor(None, q.put, item)
-
-
 def to_serializable(payload: Any) -> Any:
     """
     将 Pydantic 对象转换为 JSON 友好的类型，其余数据保持原样。
 
-    子进程和主进程在不同解释器里，只有原生类型才能经由 IPC 传输。
+    子进程和主进程在不同解释器里，只有原生类型才能被序列化后经由 IPC 传输。
     """
-    try:
-        if hasattr(payload, "model_dump"):
-            return payload.model_dump(exclude_none=True)
-    except Exception:
-        pass
+    if isinstance(payload, BaseModel):
+        return payload.model_dump(exclude_none=True)
     return payload
 
 
 async def queue_consumer_loop(
-    q: mp.Queue,
+    aq: asyncio.Queue,
     handler: Callable[[Any], Awaitable[None]],
-    poll_interval: float = 0.01,
 ) -> None:
     """
-    不断从队列消费数据并交给 handler。
+    不断从 asyncio.Queue 消费数据并交给 handler。
 
-    FastAPI lifespan 在启动 IPCManager 时会创建该任务，职责是把子进程发来的
-    数据交给广播层。为防止阻塞，这里采用“短轮询 + await handler”方式。
+    FastAPI lifespan 在启动 IPCManager 时会创建该任务，职责是把从管道读到的
+    子进程数据交给广播层。
     """
     while True:
-        try:
-            item = q.get_nowait()
-        except Empty:
-            await asyncio.sleep(poll_interval)
-            continue
-
+        item = await aq.get()
         try:
             await handler(item)
         except Exception:  # noqa: BLE001
@@ -87,136 +70,192 @@ async def queue_consumer_loop(
             pass
 
 
-async def watch_and_restart(
-    get_proc: Callable[[], mp.Process | None],
-    set_proc: Callable[[mp.Process], None],
-    restart_factory: Callable[[], mp.Process],
-    interval: float = 2.0,
-    log: logging.Logger | None = None,
-) -> None:
-    """
-    监控指定子进程状态并在意外退出后重启。
-
-    Args:
-        get_proc: 获取当前被监控进程的函数
-        set_proc: 设置/替换当前进程引用的函数
-        restart_factory: 无参工厂函数，负责启动并返回新的进程
-        interval: 轮询间隔（秒）
-        log: 可选日志器
-    """
-
-    while True:
-        try:
-            p = get_proc()
-        except Exception:
-            p = None
-
-        need_restart = (p is None) or (not p.is_alive())
-        if need_restart:
-            try:
-                if log:
-                    log.warning("检测到子进程已退出，正在尝试重新拉起")
-                new_p = restart_factory()
-                set_proc(new_p)
-            except Exception:
-                if log:
-                    log.exception("重启子进程失败")
-        await asyncio.sleep(interval)
-
-
 class IPCManager:
     """
-    封装“启动子进程 + 队列消费者 + watcher”这一整套流程。
+    封装“启动子进程 + 队列消费者 + 退出监视”这一整套流程。
 
     FastAPI lifespan 调用 `await IPCManager.start()` 后会得到：
-    - 子进程：调用 spawn_proc(queue) 启动；
+    - 子进程：调用 spawn_proc(conn) 启动，conn 为管道写端；
+    - 读回调：管道读端注册到事件循环（add_reader），可读时把数据放入 asyncio.Queue；
     - 消费任务：queue_consumer_loop -> handler -> WebSocket 广播；
-    - 监视任务：watch_and_restart 防止子进程意外退出。
+    - 退出监视：子进程 sentinel 注册到事件循环，退出时由 _on_child_exit 立即重新拉起；
+      若子进程启动后很快退出，则按指数退避延迟拉起，避免高频重启。
     关闭 FastAPI 时再调用 stop，保证所有后台任务/进程都被收敛。
     """
 
     def __init__(
         self,
-        spawn_proc: Callable[[mp.Queue], mp.Process],
+        spawn_proc: Callable[[Connection], mp.Process],
         handler: Callable[[Any], Awaitable[None]],
         log: logging.Logger | None = None,
-        watch_interval: float = 2.0,
-        poll_interval: float = 0.01,
+        restart_retry_interval: float = 2.0,
+        min_uptime: float = 10.0,
+        max_restart_backoff: float = 30.0,
     ) -> None:
+        """
+        Args:
+            spawn_proc: 接收管道写端并启动、返回子进程的函数。
+            handler: 处理子进程消息的协程函数。
+            log: 可选日志器。
+            restart_retry_interval: 重启子进程失败后的重试间隔（秒），
+                同时也是快速退出后退避的初始等待时间。
+            min_uptime: 子进程运行不足该时长（秒）即退出时视为启动即崩溃，按退避延迟重启；
+                运行超过该时长后退出则立即重启并重置退避。
+            max_restart_backoff: 退避等待时间的上限（秒）。
+        """
         self._spawn_proc = spawn_proc
         self._handler = handler
         self._log = log
-        self._watch_interval = watch_interval
-        self._poll_interval = poll_interval
-
-        self._queue: mp.Queue | None = None
+        self._restart_retry_interval = restart_retry_interval
+        self._min_uptime = min_uptime
+        self._max_restart_backoff = max_restart_backoff
+
+        self._reader: Connection | None = None
+        self._writer: Connection | None = None
+        self._aqueue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
         self._proc: mp.Process | None = None
         self._consumer_task: asyncio.Task | None = None
-        self._watcher_task: asyncio.Task | None = None
+        self._retry_handle: asyncio.TimerHandle | None = None
+        self._proc_started_at = 0.0
+        self._restart_backoff = 0.0
+
+    def _on_readable(self) -> None:
+        """
+        管道读端可读时由事件循环回调：读出当前已到达的全部消息并放入 asyncio.Queue。
+
+        管道只传输原始字节，不经过 pickle；整个过程无线程、无轮询。
+        """
+        try:
+            while self._reader.poll():
+                self._aqueue.put_nowait(self._reader.recv_bytes())
+        except (EOFError, OSError):
+            # 管道已关闭，取消注册，避免事件循环反复回调
+            self._loop.remove_reader(self._reader.fileno())
+            if self._log:
+                self._log.error("IPC 管道已关闭")
+
+    def _watch_proc(self) -> None:
+        """把当前子进程的 sentinel 注册到事件循环，子进程退出时该描述符变为可读。"""
+        self._proc_started_at = self._loop.time()
+        self._loop.add_reader(self._proc.sentinel, self._on_child_exit)
+
+    def _on_child_exit(self) -> None:
+        """
+        子进程退出时由事件循环回调：取消注册、回收进程并重新拉起。
+
+        子进程已稳定运行 min_uptime 秒以上时立即重启并重置退避；否则视为启动即崩溃，
+        等待时间从 restart_retry_interval 起逐次翻倍（上限 max_restart_backoff），
+        避免陷入高频重启循环。
+        """
+        p = self._proc
+        self._loop.remove_reader(p.sentinel)
+        # sentinel 可读时子进程已在退出，短暂等待即可回收并拿到 exitcode
+        p.join(timeout=0.5)
+        uptime = self._loop.time() - self._proc_started_at
+        if uptime >= self._min_uptime:
+            self._restart_backoff = 0.0
+        elif self._restart_backoff == 0.0:
+            self._restart_backoff = self._restart_retry_interval
+        else:
+            self._restart_backoff = min(
+                self._restart_backoff * 2, self._max_restart_backoff
+            )
 
-    def _get_proc(self) -> mp.Process | None:
-        return self._proc
+        if self._restart_backoff == 0.0:
+            if self._log:
+                self._log.warning(
+                    f"检测到子进程已退出（exitcode={p.exitcode}），正在尝试重新拉起"
+                )
+            self._restart()
+            return
 
-    def _set_proc(self, p: mp.Process) -> None:
-        self._proc = p
+        if self._log:
+            self._log.warning(
+                f"子进程运行 {uptime:.1f} 秒后退出（exitcode={p.exitcode}），"
+                f"{self._restart_backoff:.1f} 秒后尝试重新拉起"
+            )
+        self._retry_handle = self._loop.call_later(
+            self._restart_backoff, self._restart
+        )
 
-    def _restart(self) -> mp.Process:
-        # 复用已有的 Queue，使新子进程继续向同一通道写数据
-        return self._spawn_proc(self._queue)  # type: ignore[arg-type]
+    def _restart(self) -> None:
+        """启动新的子进程并继续监视；失败时按 restart_retry_interval 重试。"""
+        self._retry_handle = None
+        try:
+            # 复用已有的管道写端，使新子进程继续向同一通道写数据
+            self._proc = self._spawn_proc(self._writer)  # type: ignore[arg-type]
+            self._watch_proc()
+        except Exception:
+            if self._log:
+                self._log.exception("重启子进程失败")
+            self._retry_handle = self._loop.call_later(
+                self._restart_retry_interval, self._restart
+            )
 
     async def start(self) -> None:
         """
         启动 IPC 所需的全部组件：
-        1. 创建 multiprocessing.Queue；
+        1. 创建单向 multiprocessing.Pipe；
         2. 启动子进程；
-        3. 拉起队列消费者任务；
-        4. 拉起 watcher 任务。
+        3. 把管道读端注册到事件循环，并拉起队列消费者任务；
+        4. 把子进程 sentinel 注册到事件循环，监视其退出。
         """
         ctx = mp.get_context("spawn")
-        self._queue = ctx.Queue()
-        self._proc = self._spawn_proc(self._queue)
+        self._reader, self._writer = ctx.Pipe(duplex=False)
+        self._loop = asyncio.get_running_loop()
+        self._proc = self._spawn_proc(self._writer)
+        self._watch_proc()
 
+        self._aqueue = asyncio.Queue()
+        self._loop.add_reader(self._reader.fileno(), self._on_readable)
         self._consumer_task = asyncio.create_task(
-            queue_consumer_loop(
-                self._queue, self._handler, poll_interval=self._poll_interval
-            )
-        )
-        self._watcher_task = asyncio.create_task(
-            watch_and_restart(
-                self._get_proc,
-                self._set_proc,
-                self._restart,
-                interval=self._watch_interval,
-                log=self._log,
-            )
+            queue_consumer_loop(self._aqueue, self._handler)
         )
         if self._log:
             self._log.info("IPC 管理器已启动")
 
     async def stop(self) -> None:
         """
-        停止 watcher/consumer 任务并终止子进程。
+        停止 consumer 任务、取消事件循环上的注册并终止子进程。
 
         FastAPI lifespan 的 shutdown 阶段会调用此方法，确保不留下僵尸进程。
         """
-        for task in (self._watcher_task, self._consumer_task):
-            if task:
-                task.cancel()
-        try:
-            await asyncio.gather(
-                *(t for t in (self._watcher_task, self._consumer_task) if t),
-                return_exceptions=True,
-            )
-        except Exception:
-            pass
+        if self._consumer_task:
+            self._consumer_task.cancel()
+            try:
+                await asyncio.gather(self._consumer_task, return_exceptions=True)
+            except Exception:
+                pass
 
-        # 终止子进程
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+
+        # 先取消 sentinel 注册，避免下面主动终止子进程时触发重启
         p = self._proc
-        if p and isinstance(p, mp.Process):
+        if self._loop is not None:
+            for fd in (
+                p.sentinel if p is not None else None,
+                self._reader.fileno() if self._reader is not None else None,
+            ):
+                if fd is None:
+                    continue
+                try:
+                    self._loop.remove_reader(fd)
+                except Exception:
+                    pass
+
+        # 终止子进程
+        if p is not None:
             try:
                 if p.is_alive():
                     p.terminate()
                     p.join(timeout=2)
+                if p.is_alive():
+                    # SIGTERM 后仍未退出（例如卡在阻塞调用中），强制结束
+                    p.kill()
+                    p.join(timeout=1)
             except Exception:
                 pass
         if self._log:
@@ -5,13 +5,13 @@ HTTP/WebSocket 层使用的 Pydantic 模型。
 from typing import Optional, Literal
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class MessageType(str, Enum):
     """WebSocket 推送的消息类别。"""
 
-    TCP_VELOCITY = "tcp_velocity"
+    TCP_VELOCITY_BATCH = "tcp_velocity_batch"
     RUNNING_PROGRAM = "running_program"
 
 
@@ -23,17 +23,27 @@ class Position(BaseModel):
     z: float = Field(..., description="Z 轴坐标，单位 mm")
 
 
-class TcpVelocityMessage(BaseModel):
+class TcpVelocitySample(BaseModel):
+    """单个采样时刻的 TCP 末端速度与位置。"""
+
+    timestamp: float = Field(..., description="采样时间，Unix 时间戳，单位 s")
+    velocity: float = Field(..., description="TCP 末端速度，单位 mm/s")
+    position: Optional[Position] = Field(default=None, description="末端坐标，可为空")
+
+
+class TcpVelocityBatchMessage(BaseModel):
     """
-    发送到 WebSocket 客户端的“TCP 末端速度”消息。
+    发送到 WebSocket 客户端的“TCP 末端速度”批量消息。
+
+    机器人以 200 Hz 推送位置，而前端刷新率通常不超过 60 Hz，因此把一个刷新周期内的
+    多个采样合并为一条消息发送，按时间先后排列，最后一个为最新值。
     """
 
     type: MessageType = Field(
-        default=MessageType.TCP_VELOCITY, description="消息类型标识"
+        default=MessageType.TCP_VELOCITY_BATCH, description="消息类型标识"
     )
-    velocity: float = Field(..., description="TCP 末端速度，单位 mm/s")
     unit: Literal["mm/s"] = Field(default="mm/s", description="速度单位")
-    position: Optional[Position] = Field(default=None, description="末端坐标，可为空")
+    samples: list[TcpVelocitySample] = Field(..., description="速度采样列表")
 
 
 class RunningProgramMessage(BaseModel):
@@ -49,6 +59,19 @@ class RunningProgramMessage(BaseModel):
     program_name: str = Field(..., description="机器人端当前运行的程序名称")
 
 
+TCP_VELOCITY_BATCH_ADAPTER = TypeAdapter(TcpVelocityBatchMessage)
+"""TcpVelocityBatchMessage 的预编译序列化器，dump_json 由 pydantic-core 直接输出 JSON 字节串。"""
+
+RUNNING_PROGRAM_ADAPTER = TypeAdapter(RunningProgramMessage)
+"""RunningProgramMessage 的预编译序列化器。"""
+
+MESSAGE_ADAPTERS: dict[type[BaseModel], TypeAdapter] = {
+    TcpVelocityBatchMessage: TCP_VELOCITY_BATCH_ADAPTER,
+    RunningProgramMessage: RUNNING_PROGRAM_ADAPTER,
+}
+"""WebSocket 推送消息类型到序列化器的映射，供机器人子进程序列化消息时查找。"""
+
+
 class SetTcpVelocityIndexRequest(BaseModel):
     """
     HTTP `/api/set_tcp_velocity_r_index` 接口的请求体验证模型。
@@ -1,18 +1,52 @@
 import math
 import time
+import asyncio
 import logging
 from typing import Optional
 
+import numpy as np
 from Agilebot import Arm, StatusCodeEnum, RobotTopicType
 from server.models import (
     Position,
-    TcpVelocityMessage,
+    TcpVelocitySample,
+    TcpVelocityBatchMessage,
     RunningProgramMessage,
 )
 from server.state import SharedState
 
+try:
+    from numba import njit
+except ImportError:
+    # 无法安装 numba 的平台上退化为普通 Python 函数，计算结果一致
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
 logger = logging.getLogger(__name__)
 
+# 热路径中频繁调用的函数绑定到模块级名称，省去每次的属性查找
+_perf_counter = time.perf_counter
+
+
+@njit(cache=True)
+def _window_velocity(window: np.ndarray) -> float:
+    """
+    计算采样窗口内的平均线速度（mm/s）。
+
+    由 numba 编译为机器码（cache=True 将编译结果缓存到磁盘，只在首次运行时编译）。
+
+    Args:
+        window: 按时间先后排列的采样，每行为 (时间, x, y, z)，至少两行且时间严格递增。
+    """
+    distance = 0.0
+    for i in range(1, window.shape[0]):
+        dx = window[i, 1] - window[i - 1, 1]
+        dy = window[i, 2] - window[i - 1, 2]
+        dz = window[i, 3] - window[i - 1, 3]
+        distance += math.sqrt(dx * dx + dy * dy + dz * dz)
+    # 线速度 = 窗口内移动路程（mm）/ 窗口时间跨度（s）
+    return distance / (window[-1, 0] - window[0, 0])
+
 
 class RobotService:
     """
@@ -20,31 +54,49 @@ class RobotService:
 
     运行流程：
     1. 通过 Agilebot Python SDK 与机器人保持长连接，订阅笛卡尔位置与 TP 程序状态；
-    2. 在 handle_cartesian_position 中基于相邻位置计算 TCP 速度；
+    2. 在 handle_cartesian_position 中基于最近若干帧位置计算平滑后的 TCP 速度；
     3. 每秒把实时速度同步到配置指定的 R 寄存器；
-    4. 将速度/程序名称通过 broadcaster 函数写入 IPC 队列，最终推送到前端。
+    4. 将速度（按刷新周期批量合并）/程序名称通过 broadcaster 函数写入 IPC 管道，最终推送到前端。
     """
 
-    def __init__(self, robot_ip: str, broadcaster, retry_interval: int = 5):
+    def __init__(
+        self,
+        robot_ip: str,
+        broadcaster,
+        retry_interval: int = 5,
+        velocity_window: int = 5,
+        batch_interval: float = 0.033,
+    ):
         """
         Args:
             robot_ip: 机器人 IP。
             broadcaster: 一个协程函数，用于把处理好的消息发回主进程（通过 IPC）。
             retry_interval: 连接失败后的重试间隔，单位秒。
+            velocity_window: 计算速度使用的采样帧数（至少 2），帧数越多速度越平滑。
+            batch_interval: 速度批量消息的发送间隔，单位秒，默认约 30 Hz。
         """
         self.robot_ip = robot_ip
         self.retry_interval = retry_interval
         self.arm: Optional[Arm] = None
         self.broadcast = broadcaster
 
-        self._last_pose: Optional[tuple[float, float, float]] = None
-        """上一次的坐标"""
-        self._last_time: Optional[float] = None
-        """上一次的时间"""
+        self._samples = np.empty((max(velocity_window, 2), 4), dtype=np.float64)
+        """最近若干帧的采样，每行为 (时间, x, y, z)，按时间先后排列"""
+        self._sample_count: int = 0
+        """_samples 中已填充的行数"""
+        # 预先触发一次 numba 编译，避免首帧处理时才编译而打断采样节奏
+        _window_velocity(np.array([[0.0, 0.0, 0.0, 0.0], [1.0, 0.0, 0.0, 0.0]]))
         self._last_tcp_velocity: float = 0.0
         """上一次的速度"""
-        self._last_sync_tcp_velocity_time: float = time.perf_counter()
-        """上一次同步速度到R寄存器的时间"""
+        self._r_write_pending = asyncio.Event()
+        """有新的速度等待写入 R 寄存器"""
+        self._r_writer_task: Optional[asyncio.Task] = None
+        """把最新速度写入 R 寄存器的后台任务"""
+        self._batch_interval = batch_interval
+        self._pending_samples: list[TcpVelocitySample] = []
+        """等待合并发送的速度采样"""
+        self._batch_task: Optional[asyncio.Task] = None
+        """定期发送速度批量消息的后台任务"""
 
     # --------------------------
     # 机器人数据解析 & 推送
@@ -84,55 +136,43 @@ class RobotService:
         计算 TCP 末端速度，并通过 IPC 广播到主进程。
 
         处理步骤：
-        1. 解析 XYZ 坐标；
-        2. 与上一帧坐标比较，求得欧式距离；
-        3. 用距离/时间差得到速度（mm/s）；
-        4. 每秒将速度写入配置的 R 寄存器；
-        5. 组织 TcpVelocityMessage，交由 broadcaster 发送给 WebSocket。
+        1. 解析 XYZ 坐标，追加到采样窗口；
+        2. 由编译后的 _window_velocity 计算窗口内相邻帧的欧式距离之和，即 TCP 末端的移动路程，
+           再用路程/窗口时间跨度得到平均速度（mm/s），起到平滑作用；
+        3. 通知 _r_register_writer 把最新速度写入配置的 R 寄存器（不在此等待写入完成）；
+        4. 组织 TcpVelocitySample 放入待发送列表，由 _batch_sender 定期合并发送。
         """
         xyz = self._extract_xyz(message)
         if xyz is None:
             return
 
-        now = time.perf_counter()
-
-        # 若为第一次接收或刚启动，初始化上次坐标与时间，不计算速度
-        if self._last_pose is None or self._last_time is None:
-            self._last_pose, self._last_time = xyz, now
-            return
+        now = _perf_counter()
+        samples, n = self._samples, self._sample_count
 
-        # 计算两次采样的时间间隔（秒）
-        dt = now - self._last_time
-        if dt <= 0:
+        # 时间未前进的采样无法计算速度，直接丢弃
+        if n and now <= samples[n - 1, 0]:
             return
 
-        # 计算三维空间位移
-        dx, dy, dz = (
-            xyz[0] - self._last_pose[0],
-            xyz[1] - self._last_pose[1],
-            xyz[2] - self._last_pose[2],
-        )
-        # 欧几里得距离（即 TCP 末端实际移动距离，单位：mm）
-        distance = math.sqrt(dx**2 + dy**2 + dz**2)
+        # 写入采样窗口：未填满时追加，填满后整体前移一行再写入末行
+        if n < len(samples):
+            n = self._sample_count = n + 1
+        else:
+            samples[:-1] = samples[1:]
+        samples[n - 1] = (now, *xyz)
 
-        # 线速度 = 距离 / 时间间隔（mm/s）
-        velocity = distance / dt
+        # 若为第一次接收或刚启动，窗口内不足两帧，不计算速度
+        if n < 2:
+            return
 
         # 更新缓存
-        self._last_pose, self._last_time, self._last_tcp_velocity = xyz, now, velocity
-
-        r_index = SharedState.get("tcp_velocity_r_index")
-        if r_index is not None and r_index > 0:
-            # 每秒同步一次到R，防止控制器压力过大
-            dt = time.perf_counter() - self._last_sync_tcp_velocity_time
-            if dt >= 1:
-                ret = self.arm.register.write_R(r_index, self._last_tcp_velocity)
-                if ret != StatusCodeEnum.OK:
-                    logger.error(f"写入 R 寄存器失败，返回值: {ret.errmsg}")
-                self._last_sync_tcp_velocity_time = time.perf_counter()
+        self._last_tcp_velocity = _window_velocity(samples[:n])
 
-        await self.broadcast(
-            TcpVelocityMessage(
+        # 只通知后台任务写入 R 寄存器，热路径不等待控制器响应
+        self._r_write_pending.set()
+
+        self._pending_samples.append(
+            TcpVelocitySample(
+                timestamp=time.time(),
                 velocity=round(self._last_tcp_velocity, 3),
                 position=Position(
                     x=round(xyz[0], 3),
@@ -142,6 +182,47 @@ class RobotService:
             )
         )
 
+    async def _r_register_writer(self):
+        """
+        后台任务：把最新的速度写入配置指定的 R 寄存器。
+
+        写寄存器需要与控制器往返通讯，放在线程中执行，不会阻塞 200 Hz 的接收循环；
+        每次只写入当时最新的速度，写完后等待 1 秒，防止控制器压力过大。
+        """
+        while True:
+            await self._r_write_pending.wait()
+            self._r_write_pending.clear()
+
+            r_index = SharedState.get("tcp_velocity_r_index")
+            if r_index is None or r_index <= 0:
+                continue
+
+            try:
+                ret = await asyncio.to_thread(
+                    self.arm.register.write_R, r_index, self._last_tcp_velocity
+                )
+                if ret != StatusCodeEnum.OK:
+                    logger.error(f"写入 R 寄存器失败，返回值: {ret.errmsg}")
+            except Exception as e:
+                logger.error(f"写入 R 寄存器异常: {e}")
+            await asyncio.sleep(1)
+
+    async def _batch_sender(self):
+        """
+        后台任务：每隔 batch_interval 把累积的速度采样合并为一条消息广播。
+
+        相比每帧发送一次，可以成倍减少序列化、IPC 与 WebSocket 帧的数量。
+        """
+        while True:
+            await asyncio.sleep(self._batch_interval)
+            if not self._pending_samples:
+                continue
+            samples, self._pending_samples = self._pending_samples, []
+            try:
+                await self.broadcast(TcpVelocityBatchMessage(samples=samples))
+            except Exception as e:
+                logger.error(f"发送速度批量消息失败: {e}")
+
     async def handle_tp_program_status(self, message: dict):
         """读取 TP 解释器状态并广播当前运行的程序名称。"""
         try:
@@ -177,26 +258,24 @@ class RobotService:
         retry_count = 0
 
         while True:
+            logger.info(f"尝试连接机器人 {self.robot_ip} (第 {retry_count + 1} 次)...")
             try:
-                logger.info(
-                    f"尝试连接机器人 {self.robot_ip} (第 {retry_count + 1} 次)..."
-                )
                 ret = self.arm.connect(self.robot_ip)
-                if ret != StatusCodeEnum.OK:
-                    logger.warning(f"连接失败: {ret.errmsg}")
-                    retry_count += 1
-                    continue
-
-                logger.info("机器人连接成功")
-                break
-
+                if ret == StatusCodeEnum.OK:
+                    logger.info("机器人连接成功")
+                    break
+                logger.warning(f"连接失败: {ret.errmsg}")
             except Exception as e:
                 logger.error(f"连接循环异常: {e}")
 
-            finally:
+            # 仅在连接失败时清理残留连接，并等待 retry_interval 后重试，避免空转占满 CPU
+            try:
                 self.arm.disconnect()
-                logger.info("断开连接，等待重试...")
-                retry_count += 1
+            except Exception:
+                pass
+            logger.info(f"断开连接，{self.retry_interval} 秒后重试...")
+            retry_count += 1
+            await asyncio.sleep(self.retry_interval)
 
         await self.arm.sub_pub.connect()
         await self.arm.sub_pub.subscribe_status(
@@ -206,6 +285,8 @@ class RobotService:
             ],
             frequency=200,
         )
+        self._batch_task = asyncio.create_task(self._batch_sender())
+        self._r_writer_task = asyncio.create_task(self._r_register_writer())
         await self.arm.sub_pub.start_receiving(self.handle_robot_message)
         logger.info("状态订阅成功，开始接收消息")
 
@@ -4,39 +4,67 @@
 
 FastAPI 主进程不会直接与机器人通讯，而是通过 multiprocessing 启动本文件中的
 robot_main：该子进程负责运行事件循环、连接机器人、监听状态并把加工后的数据
-写入 IPC 队列，供主进程进一步广播给 WebSocket 客户端。
+写入 IPC 管道，供主进程进一步广播给 WebSocket 客户端。
 """
 
 
-def robot_main(robot_ip: str, retry_interval: int, out_queue):
+def robot_main(robot_ip: str, retry_interval: int, out_conn):
     """
-    子进程主函数：创建 RobotService 并把消息写入 IPC 队列。
+    子进程主函数：创建 RobotService 并把消息写入 IPC 管道。
 
     Args:
         robot_ip: 目标机器人 IP。
         retry_interval: RobotService 连接失败后的重试间隔。
-        out_queue: multiprocessing.Queue，用于向主进程发送消息。
+        out_conn: multiprocessing.Pipe 的写端，用于向主进程发送消息。
     """
     import asyncio
+    import os
+    import signal
+
+    import orjson
 
     from server.robot_services import RobotService as _RobotService
-    from server.ipc_utils import async_queue_put, to_serializable
-    from server.logger import logger
+    from server.ipc_utils import to_serializable
+    from server.models import MESSAGE_ADAPTERS
+    from server.logger import logger, _shutdown as _flush_logs
+
+    def _on_sigterm(signum, frame):
+        """
+        主进程通过 terminate()（SIGTERM）结束子进程时调用。
 
-    async def _queue_broadcast(body):
+        atexit 不会在 SIGTERM 下执行，这里先把攒批中的日志写入文件，再用 os._exit
+        立即退出；不抛出 SystemExit，避免等待事件循环清理及 to_thread 中阻塞的
+        write_R 调用，保证主进程的 stop() 不被拖住。
+        """
+        _flush_logs()
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+
+    async def _ipc_broadcast(body):
         """
         RobotService 在子进程中调用的“广播函数”。
 
-        本质是把 Pydantic/字典转换为可序列化数据后写入 IPC 队列。
+        本质是把 Pydantic/字典在子进程内一次性序列化为 JSON 字节串后写入 IPC 管道，
+        主进程收到后无需再次编码即可广播。已知的消息模型通过预编译的 TypeAdapter
+        直接输出 JSON 字节串，省去“先 model_dump 成 dict 再编码”的两步；其余数据
+        仍由 orjson 编码。
+
+        send_bytes 直接写入原始字节，不经过 pickle；单条消息远小于管道缓冲区，
+        只要主进程正常读取就不会阻塞。
         """
-        data = to_serializable(body)
-        await async_queue_put(out_queue, data)
+        adapter = MESSAGE_ADAPTERS.get(type(body))
+        if adapter is not None:
+            data = adapter.dump_json(body, exclude_none=True)
+        else:
+            data = orjson.dumps(to_serializable(body))
+        out_conn.send_bytes(data)
 
     async def _run():
         """运行机器人通讯逻辑；异常时记录日志后退出进程。"""
         service = _RobotService(
             robot_ip=robot_ip,
-            broadcaster=_queue_broadcast,
+            broadcaster=_ipc_broadcast,
             retry_interval=retry_interval,
         )
         try:
@@ -49,7 +77,7 @@ def robot_main(robot_ip: str, retry_interval: int, out_queue):
     asyncio.run(_run())
 
 
-def start_robot_process(robot_ip: str, q):
+def start_robot_process(robot_ip: str, conn):
     """
     启动机器人子进程。
 
@@ -58,4 +86,4 @@ def start_robot_process(robot_ip: str, q):
     from server.ipc_utils import start_process
 
     # 默认将重试间隔设为 5 秒；如需自定义可以在主进程调用处调整
-    return start_process(robot_main, (robot_ip, 5, q), daemon=True)
+    return start_process(robot_main, (robot_ip, 5, conn), daemon=True)
@@ -13,34 +13,52 @@ class SharedState:
     场景：
     - HTTP 请求 `/api/set_tcp_velocity_r_index` 在主进程中调用 `set` 写入最新的 R 编号；
     - 机器人子进程在写寄存器前通过 `get` 读取编号；
-    - 为避免频繁写磁盘，set 只更新内存 pending，后台线程定期 flush。
+    - 为避免频繁写磁盘，set 只更新内存状态，后台线程定期 flush。
 
     设计要点：
-    - get 每次都从磁盘读取，保证多进程读一致；
-    - set 只允许同进程内多次调用，线程安全；
+    - get 每次都检查文件元数据，只有文件发生变化时才重新读取解析，保证多进程读一致；
+    - set 只允许在同一个进程（主进程）内调用，线程安全；
+    - 写入进程启动时读取一次文件，此后以内存中的完整状态为准，flush 时直接整体写出，
+      无需再读取、合并旧文件；
     - flush 采用“写临时文件再替换”保证原子性，防止重启后状态丢失。
     """
 
     _file_path = os.path.join(DATA_DIR, "state.json")
-    _pending = {}
+    _data = {}
     _dirty = False
     _lock = threading.Lock()
     _flush_interval = 5
     _initialized = False
+    _cached = (None, None)
 
     @classmethod
     def _init(cls):
-        """确保后台 flush 线程只启动一次。"""
+        """加载已有状态，并确保后台 flush 线程只启动一次。"""
         if cls._initialized:
             return
-        cls._initialized = True
+        with cls._lock:
+            if cls._initialized:
+                return
+            cls._data = cls._load_file() or {}
+            cls._initialized = True
 
         t = threading.Thread(target=cls._flush_worker, daemon=True)
         t.start()
 
+    @classmethod
+    def _load_file(cls):
+        """读取状态文件，文件不存在或损坏时返回 None。"""
+        if not os.path.exists(cls._file_path):
+            return None
+        try:
+            with open(cls._file_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+
     @classmethod
     def _flush_worker(cls):
-        """后台线程：定期将 pending 状态刷盘。"""
+        """后台线程：定期将内存状态刷盘。"""
         while True:
             time.sleep(cls._flush_interval)
             cls._flush_to_file()
@@ -48,30 +66,18 @@ class SharedState:
     @classmethod
     def _flush_to_file(cls):
         """
-        将 pending 中的键值写入 JSON 文件。
+        将内存中的完整状态写入 JSON 文件。
 
         步骤：
-        1. 读取现有文件（若存在）；
-        2. 合并 pending；
-        3. 以 `<file>.tmp` 临时文件写入新内容；
-        4. os.replace 原子替换。
+        1. 在锁内复制一份内存状态；
+        2. 以 `<file>.tmp` 临时文件写入新内容；
+        3. os.replace 原子替换。
         """
         with cls._lock:
             if not cls._dirty:
                 return
 
-            data = {}
-            if os.path.exists(cls._file_path):
-                try:
-                    with open(cls._file_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                except json.JSONDecodeError:
-                    pass
-
-            for k, v in cls._pending.items():
-                data[k] = v
-
-            cls._pending.clear()
+            data = dict(cls._data)
             cls._dirty = False
 
         tmp = cls._file_path + ".tmp"
@@ -82,24 +88,34 @@ class SharedState:
 
     @classmethod
     def set(cls, key: str, value):
-        """写入状态（线程安全，本进程内部调用）。"""
+        """写入状态（线程安全，仅限主进程调用）。"""
         cls._init()
         with cls._lock:
-            cls._pending[key] = value
+            cls._data[key] = value
             cls._dirty = True
 
     @classmethod
     def get(cls, key: str, default=None):
-        """从磁盘读取状态（多进程安全，每次读最新）。"""
+        """
+        读取状态（多进程安全，每次读最新）。
+
+        flush 通过 os.replace 写入新文件，因此以 (inode, mtime, size) 判断文件是否变化；
+        未变化时直接返回上次解析的结果，省去 open/read 与 JSON 解析。
+        """
         cls._init()
 
-        if not os.path.exists(cls._file_path):
+        try:
+            st = os.stat(cls._file_path)
+        except OSError:
             return default
 
-        try:
-            with open(cls._file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (json.JSONDecodeError, OSError):
+        stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached_key, data = cls._cached
+        if stat_key != cached_key:
+            data = cls._load_file()
+            cls._cached = (stat_key, data)
+
+        if data is None:
             return default
 
         return data.get(key, default)